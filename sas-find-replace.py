@@ -4,15 +4,91 @@ SAS File Find and Replace Tool
 A Tkinter-based desktop application for finding and replacing text across multiple SAS files.
 """
 
+import codecs
 import os
+import queue
 import re
 import shutil
+import sys
+import tempfile
+import functools
+import mmap
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
-import Creation Datetime
+import datetime
 import threading
-import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Copy-on-write file cloning (Linux only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Optional: better guess of the encoding of non UTF-8 files
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+# Optional: RE2 linear-time (DFA-based) regex engine
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Number of files handed to a worker process at a time
+PROCESS_CHUNKSIZE = 16
+
+# Up to this many files are processed in the calling process, where starting
+# worker processes would take longer than the work itself
+SERIAL_FILE_LIMIT = 64
+
+# Number of threads scanning directories concurrently
+WALK_WORKERS = 32
+
+# ioctl request that clones a file's extents on copy-on-write file systems (Btrfs, XFS)
+FICLONE = 0x40049409
+
+# Any byte outside the ASCII range; searched directly on the file mapping
+_NON_ASCII_BYTE = re.compile(rb'[\x80-\xff]')
+
+# Character class categories from sre_parse that include the newline character
+_NEWLINE_CATEGORIES = frozenset({sre_parse.CATEGORY_SPACE, sre_parse.CATEGORY_NOT_DIGIT, sre_parse.CATEGORY_NOT_WORD})
+
+# Repeat opcodes from sre_parse; POSSESSIVE_REPEAT only exists on Python 3.11+
+_REPEAT_OPS = frozenset(op for op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT,
+                                      getattr(sre_parse, 'POSSESSIVE_REPEAT', None)) if op is not None)
+
+# Atomic group opcode from sre_parse; only exists on Python 3.11+
+_ATOMIC_GROUP = getattr(sre_parse, 'ATOMIC_GROUP', None)
+
+# Folders never searched: backups created by this tool and version control/cache folders
+SKIPPED_FOLDERS = frozenset({'backups', '.git', '.svn', '__pycache__'})
+
+# Maximum number of matching lines collected per file for the preview
+PREVIEW_LIMIT = 500
+
+# Number of rows added to the changes preview per UI update
+PREVIEW_CHUNK_ROWS = 500
+
+# Interval in milliseconds at which worker updates are applied to the UI
+UI_POLL_MS = 100
+
+# Byte order marks and the encodings they identify. The UTF-16 codecs keep the
+# BOM as a leading character, so it is written back unchanged.
+BYTE_ORDER_MARKS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
 
 """----------------------------------------------------------------------------------------------------------/
     Utility Functions
@@ -45,7 +121,7 @@ def create_backup_directory(root_folder):
     Returns:
         str: Path to the created backup directory
     """
-    timestamp = Creation Datetime.Creation Datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_dir = os.path.join(root_folder, "backups", f"backup_{timestamp}")
     
     # Create the backup directory if it doesn't exist
@@ -53,17 +129,149 @@ def create_backup_directory(root_folder):
     
     return backup_dir
 
+def get_relative_path(file_path, root_folder, root_prefix=None):
+    """
+    Get the path of a file relative to the root folder.
+    
+    Files found by search_files start with the root folder joined to a separator,
+    so slicing that prefix off avoids the normalization os.path.relpath does.
+    
+    Args:
+        file_path (str): Path of the file
+        root_folder (str): Root folder path
+        root_prefix (str): os.path.join(root_folder, ''), precomputed by callers in a loop
+        
+    Returns:
+        str: Path relative to the root folder
+    """
+    if root_prefix is None:
+        root_prefix = os.path.join(root_folder, '')
+    if file_path.startswith(root_prefix):
+        return file_path[len(root_prefix):]
+    # Paths not built from the root folder, e.g. reached through a symlink
+    return os.path.relpath(file_path, root_folder)
+
+def backup_file(file_path, backup_path):
+    """
+    Back up a file before it is replaced, avoiding a data copy where possible.
+    
+    Modified files are always written through os.replace, which gives the original
+    path a new inode, so a hard link to the old inode stays an unchanged copy.
+    When hard links are not possible, a copy-on-write clone is tried on Linux,
+    and a regular copy is the last resort.
+    
+    Args:
+        file_path (str): File to back up; a symlink is backed up as the file it points to
+        backup_path (str): Destination of the backup
+    """
+    # os.link would link the symlink itself, leaving a backup without the content
+    source = os.path.realpath(file_path)
+    try:
+        os.link(source, backup_path)
+        return
+    except OSError:
+        pass
+    
+    if fcntl is not None and sys.platform.startswith('linux'):
+        try:
+            with open(source, 'rb') as src, open(backup_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, backup_path)
+            return
+        except OSError:
+            pass
+    
+    shutil.copy2(source, backup_path)
+
+def detect_bom(data):
+    """
+    Detect the encoding of file data from its byte order mark.
+    
+    Args:
+        data: File content as bytes or a buffer supporting slicing (e.g. mmap)
+        
+    Returns:
+        str: Encoding identified by the BOM, or None if there is no BOM
+    """
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if data[:len(bom)] == bom:
+            return encoding
+    return None
+
+def decode_content(data, encoding=None):
+    """
+    Decode file data, detecting its encoding without reading the file again.
+    
+    The encoding is taken from the BOM, otherwise UTF-8 is tried, then charset_normalizer
+    (if installed) and finally Latin-1, all on the same in-memory buffer.
+    
+    Args:
+        data: File content as bytes or a buffer (e.g. mmap)
+        encoding (str): Encoding already detected from the BOM, if any
+        
+    Returns:
+        str: Decoded content
+        str: Encoding used
+    """
+    encoding = encoding or detect_bom(data)
+    if encoding:
+        return str(data, encoding), encoding
+    
+    try:
+        return str(data, 'utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(bytes(data)).best()
+        if best is not None:
+            return str(best), best.encoding
+    
+    return str(data, 'latin-1'), 'latin-1'
+
 """----------------------------------------------------------------------------------------------------------/
     File Processing Functions
 /----------------------------------------------------------------------------------------------------------"""
 
+def _scan_directory(folder, extensions):
+    """
+    Scan a single directory for matching files and subdirectories.
+    
+    Args:
+        folder (str): Directory to scan
+        extensions (tuple): Tuple of lowercase file extensions to search for
+        
+    Returns:
+        list: Paths of matching files in the directory
+        list: Paths of subdirectories to descend into (excluding SKIPPED_FOLDERS)
+    """
+    files = []
+    subdirs = []
+    
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                # Like os.walk, do not follow symlinked directories
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIPPED_FOLDERS:
+                        subdirs.append(entry.path)
+                # Symlinked files are included, as os.walk lists them; is_file() only
+                # needs an extra stat for symlinks
+                elif entry.is_file() and entry.name.lower().endswith(extensions):
+                    files.append(entry.path)
+    except OSError:
+        # Unreadable directories are skipped, as os.walk does
+        pass
+    
+    return files, subdirs
+
 def search_files(root_folder, extensions, include_subfolders=True):
     """
     Search for files with specific extensions in the given root folder.
     
     Args:
         root_folder (str): The root directory to start the search from
-        extensions (list): List of file extensions to search for
+        extensions (list): List of file extensions to search for, compared case-insensitively
         include_subfolders (bool): Whether to include subfolders in the search
         
     Returns:
@@ -71,25 +279,531 @@ def search_files(root_folder, extensions, include_subfolders=True):
     """
     found_files = []
     
+    # str.endswith checks a whole tuple of suffixes in a single call; both sides are
+    # lowercased so that .SAS and .sas match the same files
+    extensions = tuple(ext.lower() for ext in extensions)
+    
     if include_subfolders:
-        # Walk through all directories and subdirectories
-        for root, _, files in os.walk(root_folder):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if any(file.endswith(ext) for ext in extensions):
-                    found_files.append(file_path)
+        # Scan each level of the tree on a thread pool so the directory reads overlap
+        with ThreadPoolExecutor(max_workers=WALK_WORKERS) as executor:
+            folders = [root_folder]
+            while folders:
+                next_folders = []
+                for files, subdirs in executor.map(functools.partial(_scan_directory, extensions=extensions), folders):
+                    found_files.extend(files)
+                    next_folders.extend(subdirs)
+                folders = next_folders
+        
+        # Sort for a stable, depth-independent listing
+        found_files.sort()
     else:
-        # Only look at files in the root directory
-        for file in os.listdir(root_folder):
-            file_path = os.path.join(root_folder, file)
-            if os.path.isfile(file_path) and any(file.endswith(ext) for ext in extensions):
-                found_files.append(file_path)
+        # Only look at files in the root directory; errors reading it are reported
+        with os.scandir(root_folder) as entries:
+            found_files = [entry.path for entry in entries
+                           if entry.is_file() and entry.name.lower().endswith(extensions)]
     
     return found_files
 
-def process_files(file_paths, search_string, replace_string, use_regex, preview_only=True, create_backups=False, root_folder=None):
+@functools.lru_cache(maxsize=256)
+def _can_match_empty(pattern):
+    """
+    Check whether a regex can produce an empty match.
+    
+    Args:
+        pattern (str): Regular expression pattern
+        
+    Returns:
+        bool: True if the pattern may match the empty string somewhere
+    """
+    try:
+        return sre_parse.parse(pattern).getwidth()[0] == 0
+    except Exception:
+        return True
+
+@functools.lru_cache(maxsize=256)
+def _compile(pattern, fast_regex=False):
+    """
+    Compile a regular expression, caching the result per process.
+    
+    Patterns are compiled in multiline mode, so ^ and $ anchor at every line as they
+    did when the pattern was applied to each line separately.
+    
+    Args:
+        pattern (str or bytes): Regular expression pattern
+        fast_regex (bool): Use the RE2 engine when available. Patterns RE2 does not
+            support (lookarounds, backreferences) fall back to the re module, as do
+            patterns that can match the empty string, whose empty matches the RE2
+            Python wrapper reports twice, and {,n} repeats, which RE2 reads as text.
+            RE2 word, digit and space classes are ASCII only, so only ask for it
+            when matching ASCII content.
+        
+    Returns:
+        Compiled pattern
+    """
+    text = pattern.decode('ascii') if isinstance(pattern, bytes) else pattern
+    if fast_regex and re2 is not None and not _can_match_empty(text) and not re.search(r'\{,\d', text):
+        # Unsupported patterns are expected here, so RE2 should not log them to stderr
+        options = re2.Options()
+        options.log_errors = False
+        try:
+            return re2.compile((b'(?m)' if isinstance(pattern, bytes) else '(?m)') + pattern, options)
+        except re2.error:
+            pass
+    return re.compile(pattern, re.MULTILINE)
+
+def _class_matches_newline(items):
+    """
+    Check whether the items of a parsed character class include a newline.
+    
+    Args:
+        items (list): Items of an IN node from sre_parse, without NEGATE
+        
+    Returns:
+        bool: True if one of the items matches a newline
+    """
+    for op, av in items:
+        if op is sre_parse.LITERAL and av == 10:
+            return True
+        if op is sre_parse.RANGE and av[0] <= 10 <= av[1]:
+            return True
+        if op is sre_parse.CATEGORY and av in _NEWLINE_CATEGORIES:
+            return True
+    return False
+
+def _pattern_is_line_local(parsed, flags):
+    """
+    Check whether a parsed pattern can neither match a newline nor look past one.
+    
+    Args:
+        parsed: Parsed (sub)pattern from sre_parse
+        flags (int): Regex flags in effect for the (sub)pattern
+        
+    Returns:
+        bool: True if every match of the pattern stays on a single line
+    """
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            if av == 10:
+                return False
+        elif op is sre_parse.NOT_LITERAL:
+            if av != 10:
+                return False
+        elif op is sre_parse.ANY:
+            if flags & sre_parse.SRE_FLAG_DOTALL:
+                return False
+        elif op is sre_parse.IN:
+            negated = bool(av) and av[0][0] is sre_parse.NEGATE
+            if _class_matches_newline(av[1:] if negated else av) != negated:
+                return False
+        elif op is sre_parse.AT:
+            # \A and \Z refer to the whole file rather than to the line, and \B can match
+            # between two newlines, where a single empty line has no position to match
+            if av in (sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END_STRING,
+                      sre_parse.AT_NON_BOUNDARY):
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if not _pattern_is_line_local(sub, (flags | add_flags) & ~del_flags):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not all(_pattern_is_line_local(sub, flags) for sub in av[1]):
+                return False
+        elif op in _REPEAT_OPS:
+            if not _pattern_is_line_local(av[2], flags):
+                return False
+        elif op is sre_parse.GROUPREF_EXISTS:
+            _, yes, no = av
+            if not _pattern_is_line_local(yes, flags) or (no is not None and not _pattern_is_line_local(no, flags)):
+                return False
+        elif op is _ATOMIC_GROUP:
+            if not _pattern_is_line_local(av, flags):
+                return False
+        elif op is not sre_parse.GROUPREF:
+            # Lookarounds can see past the end of the line; anything else is unknown
+            return False
+    return True
+
+@functools.lru_cache(maxsize=256)
+def _is_line_local(pattern):
+    """
+    Check whether running a regex over a whole file matches exactly what running it on
+    each line would.
+    
+    Args:
+        pattern (str): Regular expression pattern
+        
+    Returns:
+        bool: True if the pattern can be applied to the whole file at once
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return False
+    return _pattern_is_line_local(parsed, parsed.state.flags)
+
+@functools.lru_cache(maxsize=256)
+def _required_literal(pattern):
+    """
+    Find the longest literal string that every match of a regex must contain.
+    
+    Only literals at the top level of the pattern are considered, so the result is
+    empty when no such literal can be determined reliably (e.g. alternations or
+    case-insensitive patterns).
+    
+    Args:
+        pattern (str): Regular expression pattern
+        
+    Returns:
+        str: Required literal, or an empty string if there is none
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return ''
+    
+    if parsed.state.flags & sre_parse.SRE_FLAG_IGNORECASE:
+        return ''
+    
+    longest = current = ''
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            current += chr(av)
+        elif op is sre_parse.IN and len(av) == 1 and av[0][0] is sre_parse.LITERAL:
+            # Single character class such as [;]
+            current += chr(av[0][1])
+        else:
+            longest = max(longest, current, key=len)
+            current = ''
+    
+    return max(longest, current, key=len)
+
+def _collect_line_matches(content, find_next, replace_line, limit=None):
+    """
+    Build the before/after preview for the lines that contain a match.
+    
+    The search resumes on the line after each matching line, so the cost grows with
+    the number of matching lines rather than with the number of matches.
+    
+    Args:
+        content (str, bytes or mmap): Full file content
+        find_next (callable): Returns the start offset of the first match at or after
+            a given offset, or -1 if there is none. Matches must not span lines.
+        replace_line (callable): Applies the replacement to a single line
+        limit (int): Maximum number of lines to collect, or None for no limit
+        
+    Returns:
+        list: List of (line number, line before, line after) tuples, one per matching line,
+            with lines as str for str content and bytes otherwise
+        bool: Whether matching lines were left out because of the limit
+    """
+    file_matches = []
+    truncated = False
+    newline, carriage_return = ('\n', '\r') if isinstance(content, str) else (b'\n', b'\r')
+    
+    # mmap objects have no count(), so newlines are counted on the slice instead
+    if isinstance(content, mmap.mmap):
+        count_newlines = lambda start, end: content[start:end].count(newline)
+    else:
+        count_newlines = lambda start, end: content.count(newline, start, end)
+    
+    # Number and start of the line after the previous matching line
+    line_no = 1
+    line_start = 0
+    size = len(content)
+    
+    start = find_next(0)
+    while start != -1:
+        if len(file_matches) == limit:
+            truncated = True
+            break
+        
+        # Newlines only need counting when the match is further down than the next line
+        previous_newline = content.rfind(newline, line_start, start)
+        if previous_newline != -1:
+            line_no += count_newlines(line_start, previous_newline + 1)
+            line_start = previous_newline + 1
+        line_end = content.find(newline, start)
+        if line_end == -1:
+            line_end = size
+        
+        line = content[line_start:line_end].rstrip(carriage_return)
+        file_matches.append((line_no, line, replace_line(line)))
+        
+        # Further matches on the same line share its preview entry
+        if line_end == size:
+            break
+        line_no += 1
+        line_start = line_end + 1
+        start = find_next(line_start)
+    
+    return file_matches, truncated
+
+def _subn_lines(pattern, replacement, content, limit=None):
+    """
+    Apply a regex to each line separately, keeping the original line endings.
+    
+    Used for patterns that could match across lines and for files with mixed line
+    endings, where a single whole-file pass would not match the same text.
+    
+    Args:
+        pattern: Compiled pattern
+        replacement (str or bytes): Replacement template
+        content (str or bytes): Full file content
+        limit (int): Maximum number of lines to collect for the preview, or None
+        
+    Returns:
+        str or bytes: New content
+        int: Number of matches
+        list: List of (line number, line before, line after) tuples for the preview
+        bool: Whether matching lines were left out of the preview because of the limit
+    """
+    newline, carriage_return = ('\n', '\r') if isinstance(content, str) else (b'\n', b'\r')
+    lines = content.split(newline)
+    
+    # The empty string after a final newline is not a line of its own
+    trailing = len(lines) > 1 and not lines[-1]
+    if trailing:
+        lines.pop()
+    
+    file_matches = []
+    truncated = False
+    match_count = 0
+    new_lines = []
+    for line_no, line in enumerate(lines, 1):
+        ending = carriage_return if line.endswith(carriage_return) else content[:0]
+        body = line[:-1] if ending else line
+        new_body, n = pattern.subn(replacement, body)
+        if n:
+            match_count += n
+            if limit is None or len(file_matches) < limit:
+                file_matches.append((line_no, body, new_body))
+            else:
+                truncated = True
+        new_lines.append(new_body + ending)
+    
+    if trailing:
+        new_lines.append(content[:0])
+    return newline.join(new_lines), match_count, file_matches, truncated
+
+def _regex_replace(pattern, replacement, content, line_local, limit=None):
     """
-    Process files to find and replace text.
+    Apply a regex to a file with the same result as applying it to each line.
+    
+    Line-local patterns run over the whole file in one pass, on CRLF files
+    after converting the line endings to LF so $ still matches at the end of a line.
+    Other patterns and files with mixed line endings are processed line by line.
+    
+    Args:
+        pattern: Compiled pattern
+        replacement (str or bytes): Replacement template
+        content (str, bytes or mmap): Full file content
+        line_local (bool): Whether no match of the pattern can span lines
+        limit (int): Maximum number of lines to collect for the preview, or None
+        
+    Returns:
+        str or bytes: New content
+        int: Number of matches
+        list: List of (line number, line before, line after) tuples for the preview
+        bool: Whether matching lines were left out of the preview because of the limit
+    """
+    newline = '\n' if isinstance(content, str) else b'\n'
+    crlf = '\r\n' if isinstance(content, str) else b'\r\n'
+    
+    has_crlf = content.find(crlf) != -1
+    if (has_crlf or not line_local) and isinstance(content, mmap.mmap):
+        content = content[:]
+    
+    if not line_local or (has_crlf and content.count(crlf) != content.count(newline)):
+        return _subn_lines(pattern, replacement, content, limit)
+    
+    work = content.replace(crlf, newline) if has_crlf else content
+    
+    # The empty "line" after a final newline did not exist when lines were split,
+    # so keep patterns that match an empty string from matching there
+    trailing = work[-1:] == newline and pattern.match(work, len(work)) is not None
+    if trailing:
+        work = work[:-1]
+    
+    new_content, match_count = pattern.subn(replacement, work)
+    if not match_count:
+        return content, 0, [], False
+    
+    def find_next(pos):
+        match = pattern.search(work, pos)
+        return match.start() if match else -1
+    
+    file_matches, truncated = _collect_line_matches(work, find_next, lambda line: pattern.sub(replacement, line), limit)
+    
+    if trailing:
+        new_content += newline
+    if has_crlf:
+        new_content = new_content.replace(newline, crlf)
+    return new_content, match_count, file_matches, truncated
+
+def _process_one(file_path, search_string, replace_string, use_regex, fast_regex, preview_only, create_backups, backup_dir, root_folder, root_prefix=None, preview_limit=None):
+    """
+    Find and replace text in a single file (runs in a worker process).
+    
+    Args:
+        file_path (str): Path of the file to process
+        search_string (str): String or pattern to search for
+        replace_string (str): String to replace with
+        use_regex (bool): Whether to use regular expressions for search
+        fast_regex (bool): Whether to prefer the RE2 regex engine
+        preview_only (bool): Only preview changes without writing to the file
+        create_backups (bool): Whether to create a backup before modifying the file
+        backup_dir (str): Backup directory shared by all files of the operation
+        root_folder (str): Root folder used to build the backup path
+        root_prefix (str): Root folder joined to a separator, precomputed once for all files
+        preview_limit (int): Maximum number of matching lines to collect for the preview
+        
+    Returns:
+        tuple: File path, matches found, number of matches, number of replacements made and
+            whether matching lines were left out of the preview
+    """
+    # Files are matched line by line, so text spanning a line break is never found
+    if not use_regex and ('\n' in search_string or '\r' in search_string):
+        return file_path, [], 0, 0, False
+    
+    # Text every match must contain, used to reject files before matching
+    required = _required_literal(search_string) if use_regex else search_string
+    
+    # Pure ASCII files are searched as UTF-8 bytes, which is only equivalent to searching
+    # the text if the strings encode cleanly and a regex pattern is itself ASCII
+    try:
+        search_bytes = search_string.encode('utf-8')
+        replace_bytes = replace_string.encode('utf-8')
+    except UnicodeEncodeError:
+        search_bytes = replace_bytes = None
+    if use_regex and not search_string.isascii():
+        search_bytes = None
+    # Some ASCII patterns are only valid as str, e.g. \u0041, \N{...} or (?u)
+    if use_regex and search_bytes is not None:
+        try:
+            _compile(search_bytes, fast_regex)
+        except (re.error, ValueError):
+            search_bytes = None
+    
+    # Initialize matches list for this file
+    file_matches = []
+    truncated = False
+    match_count = 0
+    replacements = 0
+    
+    try:
+        # Map the file read-only instead of copying it into a Python buffer first
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            if os.fstat(fd).st_size == 0:
+                return file_path, file_matches, 0, 0, False
+            
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                encoding = detect_bom(mm)
+                
+                # ASCII text has the same bytes in all supported encodings but UTF-16, so
+                # files missing the required text can be rejected without decoding them
+                if (required and required.isascii() and not (encoding or '').startswith('utf-16')
+                        and mm.find(required.encode('ascii')) == -1):
+                    return file_path, file_matches, 0, 0, False
+                
+                # ASCII files (the common case for SAS code) skip the decode/encode round trip.
+                # Anything else is decoded as is, keeping the original line endings.
+                if search_bytes is not None and encoding is None and _NON_ASCII_BYTE.search(mm) is None:
+                    needle, replacement, encoding = search_bytes, replace_bytes, 'utf-8'
+                    # Compiled once per worker process thanks to the cache
+                    pattern = _compile(needle, fast_regex) if use_regex else None
+                    # The re module matches on the mapping itself; RE2 and literal
+                    # replacement need a bytes copy
+                    content = mm if isinstance(pattern, re.Pattern) else mm[:]
+                else:
+                    content, encoding = decode_content(mm, encoding)
+                    needle, replacement = search_string, replace_string
+                    # RE2 would treat non-ASCII letters and digits differently than re
+                    pattern = _compile(needle) if use_regex else None
+                
+                # Non-ASCII required text cannot occur in an ASCII file
+                if not required.isascii() and (not isinstance(content, str) or required not in content):
+                    return file_path, file_matches, 0, 0, False
+                
+                # Replace across the whole file in one pass where possible.
+                # The preview is capped, the match count is not.
+                if use_regex:
+                    new_content, match_count, file_matches, truncated = _regex_replace(
+                        pattern, replacement, content, _is_line_local(search_string), preview_limit)
+                else:
+                    match_count = content.count(needle)
+                    if match_count:
+                        new_content = content.replace(needle, replacement)
+                        # Only search for the matching lines of the preview when there are any
+                        file_matches, truncated = _collect_line_matches(
+                            content, functools.partial(content.find, needle),
+                            lambda line: line.replace(needle, replacement), preview_limit)
+                
+                if not match_count:
+                    return file_path, file_matches, 0, 0, False
+        finally:
+            os.close(fd)
+        
+        # Only the preview lines need decoding when working on bytes
+        if not isinstance(content, str):
+            file_matches = [(line_no, before.decode(encoding), after.decode(encoding))
+                            for line_no, before, after in file_matches]
+        
+        # If not just previewing, write changes to file
+        if not preview_only:
+            # Create backup if requested
+            if create_backups and backup_dir:
+                relative_path = get_relative_path(file_path, root_folder, root_prefix)
+                backup_path = os.path.join(backup_dir, relative_path)
+                
+                # Create directory structure for the backup
+                os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+                
+                # Link or copy file to backup location
+                backup_file(file_path, backup_path)
+            
+            # Write modified content to a temporary file and swap it in atomically,
+            # so a failure part way through never leaves a truncated file behind
+            if isinstance(new_content, str):
+                new_content = new_content.encode(encoding)
+            # Symlinked files are written through the link, replacing the file it points to
+            target = os.path.realpath(file_path)
+            # A unique name in the same folder never clobbers a user file and keeps
+            # os.replace on the same file system
+            tmp_fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(target),
+                prefix=f".{os.path.basename(target)}.",
+                suffix=".tmp"
+            )
+            try:
+                with os.fdopen(tmp_fd, 'wb') as f:
+                    f.write(new_content)
+                shutil.copymode(target, tmp_path)
+                # Keep the owner and group where allowed; only root may give a file away
+                if hasattr(os, 'chown'):
+                    target_stat = os.stat(target)
+                    try:
+                        os.chown(tmp_path, target_stat.st_uid, target_stat.st_gid)
+                    except OSError:
+                        pass
+                os.replace(tmp_path, target)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            
+            # Count replacements made
+            replacements = match_count
+    
+    except Exception as e:
+        # Add error to results
+        file_matches.append((0, f"Error processing file: {str(e)}", ""))
+    
+    return file_path, file_matches, match_count, replacements, truncated
+
+def process_files(file_paths, search_string, replace_string, use_regex, preview_only=True, create_backups=False, root_folder=None, fast_regex=False, progress_callback=None, preview_limit=PREVIEW_LIMIT):
+    """
+    Process files to find and replace text, spreading the files over a pool of worker processes.
     
     Args:
         file_paths (list): List of file paths to process
@@ -99,9 +813,14 @@ def process_files(file_paths, search_string, replace_string, use_regex, preview_
         preview_only (bool): Only preview changes without writing to files
         create_backups (bool): Whether to create backups before modifying files
         root_folder (str): Root folder for creating backups
+        fast_regex (bool): Whether to prefer the RE2 regex engine (no lookarounds)
+        progress_callback (callable): Called as progress_callback(done, total) while files complete
+        preview_limit (int): Maximum number of matching lines kept per file for the preview,
+            or None for no limit. Replacements always cover the whole file.
         
     Returns:
-        list: List of tuples containing file path and matches found
+        list: List of tuples containing file path, matches found, number of matches and
+            whether the preview of the file was cut at preview_limit
         dict: Statistics about the operation
     """
     results = []
@@ -112,88 +831,56 @@ def process_files(file_paths, search_string, replace_string, use_regex, preview_
         'replacements_made': 0
     }
     
-    # Create a compiled regex pattern if using regex
-    pattern = re.compile(search_string) if use_regex else None
+    # Validate the regex pattern up front so a bad pattern is reported once, not per file
+    if use_regex:
+        _compile(search_string)
     
     # Create backup directory if needed and not in preview mode
     backup_dir = None
     if create_backups and root_folder and not preview_only:
         backup_dir = create_backup_directory(root_folder)
     
-    # Process each file
-    for file_path in file_paths:
-        # Initialize matches list for this file
-        file_matches = []
-        
-        try:
-            # Attempt to detect file encoding (assuming UTF-8, falling back to Latin-1)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                encoding = 'utf-8'
-            except UnicodeDecodeError:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-                encoding = 'latin-1'
+    worker = functools.partial(
+        _process_one,
+        search_string=search_string,
+        replace_string=replace_string,
+        use_regex=use_regex,
+        fast_regex=fast_regex,
+        preview_only=preview_only,
+        create_backups=create_backups,
+        backup_dir=backup_dir,
+        root_folder=root_folder,
+        root_prefix=os.path.join(root_folder, '') if root_folder else None,
+        preview_limit=preview_limit
+    )
+    
+    # Each file is independent, so process them in parallel. The default pool size
+    # uses every CPU and respects the 61 worker limit on Windows. Workers are spawned
+    # rather than forked, since this may run on a thread of the GUI process.
+    total = len(file_paths)
+    executor = None
+    if total > SERIAL_FILE_LIMIT:
+        executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+    try:
+        if executor:
+            file_results = executor.map(worker, file_paths, chunksize=PROCESS_CHUNKSIZE)
+        else:
+            file_results = map(worker, file_paths)
+        for done, (file_path, file_matches, match_count, replacements, truncated) in enumerate(file_results, 1):
+            if match_count:
+                stats['files_modified'] += 1
+                stats['matches_found'] += match_count
+            stats['replacements_made'] += replacements
             
-            # Split content into lines for processing
-            lines = content.splitlines()
-            modified_lines = []
-            file_modified = False
+            # Add results for this file
+            results.append((file_path, file_matches, match_count, truncated))
             
-            # Process each line
-            for line_no, line in enumerate(lines, 1):
-                if use_regex:
-                    # Using regex for search and replace
-                    if pattern.search(line):
-                        modified_line = pattern.sub(replace_string, line)
-                        if modified_line != line:
-                            file_matches.append((line_no, line, modified_line))
-                            stats['matches_found'] += 1
-                            file_modified = True
-                        modified_lines.append(modified_line)
-                    else:
-                        modified_lines.append(line)
-                else:
-                    # Using simple string replacement
-                    if search_string in line:
-                        modified_line = line.replace(search_string, replace_string)
-                        file_matches.append((line_no, line, modified_line))
-                        stats['matches_found'] += 1
-                        file_modified = True
-                        modified_lines.append(modified_line)
-                    else:
-                        modified_lines.append(line)
-            
-            # If we found matches
-            if file_matches:
-                stats['files_modified'] += 1
-                # If not just previewing, write changes to file
-                if not preview_only:
-                    # Create backup if requested
-                    if create_backups and backup_dir:
-                        relative_path = os.path.relpath(file_path, root_folder)
-                        backup_path = os.path.join(backup_dir, relative_path)
-                        
-                        # Create directory structure for the backup
-                        os.makedirs(os.path.dirname(backup_path), exist_ok=True)
-                        
-                        # Copy file to backup location
-                        shutil.copy2(file_path, backup_path)
-                    
-                    # Write modified content back to the file
-                    with open(file_path, 'w', encoding=encoding) as f:
-                        f.write('\n'.join(modified_lines))
-                    
-                    # Count replacements made
-                    stats['replacements_made'] += len(file_matches)
-        
-        except Exception as e:
-            # Add error to results
-            file_matches.append((0, f"Error processing file: {str(e)}", ""))
-        
-        # Add results for this file
-        results.append((file_path, file_matches))
+            # Report progress once per chunk
+            if progress_callback and (done % PROCESS_CHUNKSIZE == 0 or done == total):
+                progress_callback(done, total)
+    finally:
+        if executor:
+            executor.shutdown()
     
     return results, stats
 
@@ -220,6 +907,7 @@ class FindReplaceApp:
         self.extensions_var = tk.StringVar(value=".sas")
         self.include_subfolders_var = tk.BooleanVar(value=True)
         self.use_regex_var = tk.BooleanVar(value=False)
+        self.fast_regex_var = tk.BooleanVar(value=False)
         self.create_backups_var = tk.BooleanVar(value=True)
         
         # Variables to store application state
@@ -233,9 +921,15 @@ class FindReplaceApp:
             'replacements_made': 0
         }
         
+        # Updates posted by the worker thread, applied in batches by the UI thread
+        self._ui_queue = queue.Queue()
+        
         # Setup UI components
         self.create_widgets()
         
+        # Start applying worker updates
+        self.root.after(UI_POLL_MS, self._drain_ui_queue)
+        
     def create_widgets(self):
         """Create and arrange UI components."""
         # Create main frame with padding
@@ -268,6 +962,8 @@ class FindReplaceApp:
         
         ttk.Checkbutton(option_frame, text="Include Subfolders", variable=self.include_subfolders_var).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Checkbutton(option_frame, text="Use Regular Expression", variable=self.use_regex_var).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Checkbutton(option_frame, text="Use fast DFA regex (no lookarounds)", variable=self.fast_regex_var,
+                        state=tk.NORMAL if re2 is not None else tk.DISABLED).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Checkbutton(option_frame, text="Create Backups Before Replacing", variable=self.create_backups_var).pack(side=tk.LEFT)
         
         # Search and Replace section
@@ -322,8 +1018,25 @@ class FindReplaceApp:
         self.changes_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.changes_tab, text="Changes Preview")
         
-        self.changes_text = ScrolledText(self.changes_tab, height=10, width=80)
-        self.changes_text.pack(fill=tk.BOTH, expand=True)
+        # One row per changed line, so large previews are not held in a single text widget
+        columns = ("file", "line", "before", "after")
+        self.changes_tree = ttk.Treeview(self.changes_tab, columns=columns, show="headings", height=10)
+        for column, heading, width, anchor in (
+            ("file", "File", 200, tk.W),
+            ("line", "Line", 60, tk.E),
+            ("before", "Before", 320, tk.W),
+            ("after", "After", 320, tk.W),
+        ):
+            self.changes_tree.heading(column, text=heading, anchor=tk.W)
+            self.changes_tree.column(column, width=width, anchor=anchor, stretch=(column in ("before", "after")))
+        
+        changes_yscroll = ttk.Scrollbar(self.changes_tab, orient=tk.VERTICAL, command=self.changes_tree.yview)
+        changes_xscroll = ttk.Scrollbar(self.changes_tab, orient=tk.HORIZONTAL, command=self.changes_tree.xview)
+        self.changes_tree.configure(yscrollcommand=changes_yscroll.set, xscrollcommand=changes_xscroll.set)
+        
+        changes_yscroll.pack(side=tk.RIGHT, fill=tk.Y)
+        changes_xscroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.changes_tree.pack(fill=tk.BOTH, expand=True)
         
         # Configure accent button style
         style = ttk.Style()
@@ -355,11 +1068,24 @@ class FindReplaceApp:
             ttk.Label(self.stats_frame, text=label, font=("", 10, "bold")).grid(row=0, column=i*2, sticky=tk.W, padx=(10 if i > 0 else 0, 5))
             ttk.Label(self.stats_frame, text=value).grid(row=0, column=i*2+1, sticky=tk.W)
     
-    def upCreation Date_progress(self, value, text):
-        """UpCreation Date progress bar and label."""
+    def update_progress(self, value, text):
+        """Update progress bar and label."""
         self.progress_var.set(value)
         self.progress_label.config(text=text)
-        self.root.upCreation Date_idletasks()
+    
+    def clear_changes(self):
+        """Remove all rows from the changes preview."""
+        self.changes_tree.delete(*self.changes_tree.get_children())
+    
+    def insert_change_rows(self, rows):
+        """
+        Append rows to the changes preview.
+        
+        Args:
+            rows (list): List of (file, line, before, after) tuples
+        """
+        for row in rows:
+            self.changes_tree.insert("", tk.END, values=row)
     
     def preview_changes(self):
         """Generate a preview of changes without modifying files."""
@@ -378,6 +1104,10 @@ class FindReplaceApp:
             messagebox.showwarning("Input Error", "Please enter a search text or pattern.")
             return
         
+        if '\n' in search_string:
+            messagebox.showwarning("Input Error", "The search text or pattern must fit on a single line.")
+            return
+        
         # Set replace mode flag
         self.replace_mode = False
         
@@ -401,6 +1131,10 @@ class FindReplaceApp:
             messagebox.showwarning("Input Error", "Please enter a search text or pattern.")
             return
         
+        if '\n' in search_string:
+            messagebox.showwarning("Input Error", "The search text or pattern must fit on a single line.")
+            return
+        
         # Confirm before proceeding
         confirm = messagebox.askyesno(
             "Confirm Replace", 
@@ -430,31 +1164,30 @@ class FindReplaceApp:
         search_string = self.search_text.get("1.0", tk.END).strip()
         replace_string = self.replace_text.get("1.0", tk.END).strip()
         use_regex = self.use_regex_var.get()
+        fast_regex = self.fast_regex_var.get()
         create_backups = self.create_backups_var.get()
         
         # Convert extensions string to list
         extensions_list = get_file_extension_list(extensions_input)
         
         try:
-            # UpCreation Date UI to show we're working
-            self.root.after(0, lambda: self.upCreation Date_progress(0, "Finding files..."))
+            # Update UI to show we're working
+            self._post_ui("progress", (0, "Finding files..."))
             
             # Find files based on criteria
             self.found_files = search_files(root_folder, extensions_list, include_subfolders)
             
-            # UpCreation Date progress
-            self.root.after(0, lambda: self.upCreation Date_progress(20, f"Found {len(self.found_files)} matching file(s)"))
-            time.sleep(0.5)  # Pause briefly to show the message
+            # Update progress; the UI poller shows it on its next tick without blocking the worker
+            self._post_ui("progress", (20, f"Found {len(self.found_files)} matching file(s), scanning..."))
             
-            # UpCreation Date files list in the UI
-            files_text = "\n".join(self.found_files)
-            self.root.after(0, lambda: self.files_list.delete("1.0", tk.END))
-            self.root.after(0, lambda: self.files_list.insert(tk.END, files_text))
+            # Update files list in the UI
+            self._post_ui("clear_files")
+            self._post_ui("files", self.found_files)
             
             if self.found_files:
                 # Process files to find/replace text
                 operation_text = "Generating preview..." if preview_only else "Performing replacements..."
-                self.root.after(0, lambda: self.upCreation Date_progress(30, operation_text))
+                self._post_ui("progress", (30, operation_text))
                 
                 # Process files
                 self.preview_data, self.stats = process_files(
@@ -464,45 +1197,54 @@ class FindReplaceApp:
                     use_regex,
                     preview_only=preview_only,
                     create_backups=create_backups,
-                    root_folder=root_folder
+                    root_folder=root_folder,
+                    fast_regex=fast_regex,
+                    progress_callback=self._report_file_progress
                 )
                 
-                # UpCreation Date progress
-                self.root.after(0, lambda: self.upCreation Date_progress(90, "Generating results..."))
+                # Update progress
+                self._post_ui("progress", (90, "Generating results..."))
                 
-                # Format changes preview
-                preview_text = ""
-                for file_path, matches in self.preview_data:
-                    rel_path = os.path.relpath(file_path, root_folder) if root_folder else file_path
-                    if matches:
-                        preview_text += f"File: {rel_path} ({len(matches)} match(es))\n"
-                        preview_text += "=" * 80 + "\n"
-                        
-                        for line_no, line_before, line_after in matches:
-                            if line_no == 0:  # Error message
-                                preview_text += f"ERROR: {line_before}\n"
-                                continue
-                                
-                            preview_text += f"Line {line_no}:\n"
-                            preview_text += "Before: " + line_before + "\n"
-                            preview_text += "After:  " + line_after + "\n"
-                            preview_text += "-" * 80 + "\n"
+                # Clear the previous preview, then add rows in chunks as they are built
+                self._post_ui("clear_changes")
+                
+                chunk = []
+                row_count = 0
+                root_prefix = os.path.join(root_folder, '') if root_folder else None
+                for file_path, matches, match_count, truncated in self.preview_data:
+                    if not matches:
+                        continue
+                    rel_path = get_relative_path(file_path, root_folder, root_prefix) if root_folder else file_path
+                    
+                    # Large match sets are capped to keep the preview responsive
+                    if truncated:
+                        chunk.append((rel_path, "", f"First {len(matches)} matching lines of {match_count} matches shown", ""))
+                    
+                    for line_no, line_before, line_after in matches:
+                        if line_no == 0:  # Error message
+                            chunk.append((rel_path, "ERROR", line_before, ""))
+                        else:
+                            chunk.append((rel_path, line_no, line_before, line_after))
+                        row_count += 1
                         
-                        preview_text += "\n"
+                        if len(chunk) >= PREVIEW_CHUNK_ROWS:
+                            self._post_ui("changes", chunk)
+                            chunk = []
                 
-                # UpCreation Date changes preview in the UI
-                self.root.after(0, lambda: self.changes_text.delete("1.0", tk.END))
-                self.root.after(0, lambda: self.changes_text.insert(tk.END, preview_text if preview_text else "No changes to preview."))
+                if chunk:
+                    self._post_ui("changes", chunk)
+                if not row_count:
+                    self._post_ui("changes", [("No changes to preview.", "", "", "")])
                 
                 # Display operation completed message
                 operation_type = "Preview" if preview_only else "Replace"
-                self.root.after(0, lambda: self.upCreation Date_progress(100, f"{operation_type} operation completed."))
+                self._post_ui("progress", (100, f"{operation_type} operation completed."))
                 
-                # UpCreation Date stats display
-                self.root.after(0, self.display_stats)
+                # Update stats display
+                self._post_ui("stats")
                 
                 # Show changes tab
-                self.root.after(0, lambda: self.notebook.select(self.changes_tab))
+                self._post_ui("select", self.changes_tab)
                 
                 # Show success message
                 if not preview_only and self.stats['replacements_made'] > 0:
@@ -518,16 +1260,115 @@ class FindReplaceApp:
                                   f"Files modified: {self.stats['files_modified']}\n"
                                   f"Replacements made: {self.stats['replacements_made']}")
                     
-                    self.root.after(0, lambda: messagebox.showinfo("Operation Complete", message))
+                    self._post_ui("info", ("Operation Complete", message))
             else:
                 # No files found
-                self.root.after(0, lambda: self.upCreation Date_progress(100, "No matching files found."))
-                self.root.after(0, lambda: messagebox.showinfo("No Files Found", "No files matching the specified criteria were found."))
+                self._post_ui("progress", (100, "No matching files found."))
+                self._post_ui("info", ("No Files Found", "No files matching the specified criteria were found."))
         
         except Exception as e:
             # Show error message
-            self.root.after(0, lambda: self.upCreation Date_progress(0, "Error occurred."))
-            self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred:\n{str(e)}"))
+            self._post_ui("progress", (0, "Error occurred."))
+            self._post_ui("error", ("Error", f"An error occurred:\n{str(e)}"))
+    
+    def _post_ui(self, kind, payload=None):
+        """
+        Queue a UI update from the worker thread.
+        
+        Args:
+            kind (str): Type of update (progress, files, changes, clear_files,
+                clear_changes, stats, select, info or error)
+            payload: Data for the update
+        """
+        self._ui_queue.put((kind, payload))
+    
+    def _drain_ui_queue(self):
+        """Apply all pending worker updates in one pass and schedule the next poll."""
+        progress = None
+        batch_kind = None
+        batch = []
+        
+        try:
+            while True:
+                try:
+                    kind, payload = self._ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                # Only the latest progress update is worth drawing
+                if kind == "progress":
+                    progress = payload
+                    continue
+                
+                # Consecutive inserts of the same kind are applied as one batch
+                if batch and kind != batch_kind:
+                    self._apply_ui_batch(batch_kind, batch)
+                    batch = []
+                if kind in ("files", "changes"):
+                    batch_kind = kind
+                    batch.extend(payload)
+                    continue
+                
+                # Bring progress up to date before anything that may open a dialog
+                if progress:
+                    self.update_progress(*progress)
+                    progress = None
+                self._apply_ui_event(kind, payload)
+            
+            if batch:
+                self._apply_ui_batch(batch_kind, batch)
+            if progress:
+                self.update_progress(*progress)
+        finally:
+            self.root.after(UI_POLL_MS, self._drain_ui_queue)
+    
+    def _apply_ui_batch(self, kind, items):
+        """
+        Insert a batch of files or change rows into the results tabs.
+        
+        Args:
+            kind (str): Either files or changes
+            items (list): File paths or (file, line, before, after) tuples
+        """
+        if kind == "files":
+            # Separate from lines inserted by an earlier batch
+            prefix = "\n" if self.files_list.index("end-1c") != "1.0" else ""
+            self.files_list.insert(tk.END, prefix + "\n".join(items))
+        else:
+            self.insert_change_rows(items)
+    
+    def _apply_ui_event(self, kind, payload):
+        """
+        Apply a single non-batched UI update.
+        
+        Args:
+            kind (str): Type of update
+            payload: Data for the update
+        """
+        if kind == "clear_files":
+            self.files_list.delete("1.0", tk.END)
+        elif kind == "clear_changes":
+            self.clear_changes()
+        elif kind == "stats":
+            self.display_stats()
+        elif kind == "select":
+            self.notebook.select(payload)
+        elif kind == "info":
+            messagebox.showinfo(*payload)
+        elif kind == "error":
+            messagebox.showerror(*payload)
+    
+    def _report_file_progress(self, done, total):
+        """
+        Report file processing progress from the worker thread.
+        
+        Args:
+            done (int): Number of files processed so far
+            total (int): Total number of files to process
+        """
+        value = 30 + 60 * done / total
+        text = f"Processed {done} of {total} file(s)..."
+        self._post_ui("progress", (value, text))
     
     def reset_app(self):
         """Reset the application to its initial state."""
@@ -546,10 +1387,10 @@ class FindReplaceApp:
         self.search_text.delete("1.0", tk.END)
         self.replace_text.delete("1.0", tk.END)
         self.files_list.delete("1.0", tk.END)
-        self.changes_text.delete("1.0", tk.END)
+        self.clear_changes()
         
         # Reset progress
-        self.upCreation Date_progress(0, "")
+        self.update_progress(0, "")
         
         # Reset stats display
         self.display_stats()